@@ -2,6 +2,28 @@
 # Simple proximity-based conjunction screening for demo purposes.
 import math
 
+import numpy as np
+
+try:
+    # Optional: KD-tree neighbour search. Left out of requirements.txt to keep
+    # serverless bundles small. Screening falls back in order: Numba kernel,
+    # conj_c extension, then the NumPy radius window (_radius_window_pairs).
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+try:
+    # Optional: JIT pair-scan kernel, used when SciPy is not installed.
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+TILE = 64  # rows per cache block in the Numba kernel
+WGS84_A_KM = 6378.137  # WGS84 equatorial radius
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)  # first eccentricity squared
+DEG2RAD = math.pi / 180.0
+
 def haversine_km(lat1, lon1, lat2, lon2):
     """Approx great-circle distance for lat/lon (km) – spherical Earth."""
     R = 6371.0
@@ -14,42 +36,180 @@ def haversine_km(lat1, lon1, lat2, lon2):
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
     return R * c
 
-def euclidean_km_from_latlonalt(lat1, lon1, alt1_km, lat2, lon2, alt2_km):
-    """Approx ECEF Euclidean distance (km) from lat/lon/alt."""
-    R = 6371.0  # mean Earth radius in km
+def to_ecef(lat, lon, alt_km):
+    """WGS84 ECEF (km) for one geodetic lat/lon/alt."""
+    phi = lat * DEG2RAD
+    lam = lon * DEG2RAD
+    cphi = math.cos(phi)
+    sphi = math.sin(phi)
+    clam = math.cos(lam)
+    slam = math.sin(lam)
+    n = WGS84_A_KM / math.sqrt(1 - WGS84_E2 * sphi * sphi)  # prime vertical radius
+    rc = (n + alt_km) * cphi
+    return (rc * clam, rc * slam, (n * (1 - WGS84_E2) + alt_km) * sphi)
+
+def sincos(a):
+    """(sin(a), cos(a)) for an array."""
+    return np.sin(a), np.cos(a)
 
-    def to_ecef(lat, lon, alt_km):
-        phi = math.radians(lat)
-        lam = math.radians(lon)
-        r = R + alt_km
-        x = r * math.cos(phi) * math.cos(lam)
-        y = r * math.cos(phi) * math.sin(lam)
-        z = r * math.sin(phi)
-        return (x, y, z)
+def to_ecef_np(lat, lon, alt_km):
+    """Vectorized to_ecef: arrays in, (x, y, z) float64 arrays out. NaN propagates."""
+    # lat and lon stacked so each transcendental runs as one ufunc call over 2N values
+    ang = np.stack((np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)))
+    s, c = sincos(ang * DEG2RAD)
+    alt = np.asarray(alt_km, dtype=np.float64)
+    n = WGS84_A_KM / np.sqrt(1 - WGS84_E2 * s[0] * s[0])
+    rc = (n + alt) * c[0]
+    return rc * c[1], rc * s[1], (n * (1 - WGS84_E2) + alt) * s[0]
 
+def ecef_to_geodetic_np(x, y, z, iterations=4):
+    """Inverse of to_ecef_np: ECEF km arrays -> WGS84 (lat_deg, lon_deg, alt_km)."""
+    p = np.hypot(x, y)
+    lat = np.arctan2(z, p * (1 - WGS84_E2))
+    for _ in range(iterations):  # converges to well under 1 mm from LEO to GEO
+        s = np.sin(lat)
+        n = WGS84_A_KM / np.sqrt(1 - WGS84_E2 * s * s)
+        lat = np.arctan2(z + WGS84_E2 * n * s, p)
+    s, c = sincos(lat)
+    n = WGS84_A_KM / np.sqrt(1 - WGS84_E2 * s * s)
+    alt = p * c + z * s - n * (1 - WGS84_E2 * s * s)
+    return np.degrees(lat), np.degrees(np.arctan2(y, x)), alt
+
+def euclidean_km_from_latlonalt(lat1, lon1, alt1_km, lat2, lon2, alt2_km):
+    """Approx ECEF Euclidean distance (km) from lat/lon/alt."""
     x1, y1, z1 = to_ecef(lat1, lon1, alt1_km)
     x2, y2, z2 = to_ecef(lat2, lon2, alt2_km)
     return math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2 + (z1 - z2) ** 2)
 
-def find_close_pairs(sat_list, threshold_km=5.0):
+try:
+    # Optional compiled helpers (see conj_c.pyx / setup.py); they replace the
+    # pure-Python scalar functions above when the extension has been built.
+    from conj_c import (
+        euclidean_km_c as euclidean_km_from_latlonalt,
+        find_close_pairs_c,
+        haversine_km_c as haversine_km,
+    )
+except ImportError:
+    find_close_pairs_c = None
+
+if njit is not None:
+    # No fastmath: the counting and fill passes must agree bit-for-bit on every
+    # threshold test, and Numba does not bounds-check the out_i/out_j writes.
+    @njit(cache=True)
+    def _tile_pairs(x, y, z, r, thr, thr2, i0, out_i, out_j, k):
+        """Pairs (i, j>i) for rows i in [i0, i0+TILE); writes from out[k] if out is non-empty. Returns hit count."""
+        n = x.shape[0]
+        i1 = min(i0 + TILE, n)
+        write = out_i.shape[0] > 0
+        hits = 0
+        for j0 in range(i0, n, TILE):
+            if r[j0] - r[i1 - 1] > thr:
+                break  # rows are sorted by radius: no later tile can match
+            j1 = min(j0 + TILE, n)
+            for i in range(i0, i1):
+                xi = x[i]
+                yi = y[i]
+                zi = z[i]
+                for j in range(max(j0, i + 1), j1):
+                    if r[j] - r[i] > thr:
+                        break
+                    dx = xi - x[j]
+                    dy = yi - y[j]
+                    dz = zi - z[j]
+                    if dx * dx + dy * dy + dz * dz <= thr2:
+                        if write:
+                            out_i[k + hits] = i
+                            out_j[k + hits] = j
+                        hits += 1
+        return hits
+
+    @njit(parallel=True, cache=True)
+    def _close_pairs_kernel(x, y, z, r, thr):
+        """Streams all pairs in TILE x TILE blocks: a counting pass sizes the output, a second pass fills it."""
+        n = x.shape[0]
+        thr2 = thr * thr
+        ntiles = (n + TILE - 1) // TILE
+        counts = np.zeros(ntiles, dtype=np.int64)
+        no_out = np.empty(0, dtype=np.int64)
+        for t in prange(ntiles):
+            counts[t] = _tile_pairs(x, y, z, r, thr, thr2, t * TILE, no_out, no_out, 0)
+        offsets = np.zeros(ntiles + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+        out_i = np.empty(offsets[ntiles], dtype=np.int64)
+        out_j = np.empty(offsets[ntiles], dtype=np.int64)
+        for t in prange(ntiles):
+            _tile_pairs(x, y, z, r, thr, thr2, t * TILE, out_i, out_j, offsets[t])
+        return out_i, out_j
+else:
+    _close_pairs_kernel = None
+
+def warm_up():
+    """Compile the Numba kernel ahead of time so the first snapshot doesn't pay for it."""
+    if cKDTree is None and _close_pairs_kernel is not None:
+        dummy = np.zeros(2, dtype=np.float64)
+        _close_pairs_kernel(dummy, dummy, dummy, dummy, 1.0)
+
+def _radius_window_pairs(r, thr):
+    """Candidate pairs (i, j>i) with r[j] - r[i] <= thr, for r sorted ascending."""
+    n = len(r)
+    hi = np.searchsorted(r, r + thr, side='right')
+    cnt = np.maximum(hi - np.arange(1, n + 1), 0)
+    ii = np.repeat(np.arange(n), cnt)
+    # position of each candidate inside its row's window
+    offs = np.arange(len(ii)) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+    return ii, ii + 1 + offs
+
+def find_close_pairs(x, y, z, threshold_km=5.0):
     """
-    sat_list: list of dicts with keys: satid, satname, satlat, satlng, satalt (km), category
-    returns list of pairs (a,b, distance_km)
+    x, y, z: equal-length ECEF (km) arrays, one entry per satellite (NaN = unknown position)
+    returns (i, j, distance_km) arrays of row indices (i < j) for pairs within threshold_km
+
+    ECEF is precomputed by the caller, so this is only subtract/square/compare.
     """
-    pairs = []
-    n = len(sat_list)
-    for i in range(n):
-        a = sat_list[i]
-        if a.get('satlat') is None or a.get('satlng') is None:
-            continue
-        for j in range(i + 1, n):
-            b = sat_list[j]
-            if b.get('satlat') is None or b.get('satlng') is None:
-                continue
-            d = euclidean_km_from_latlonalt(
-                a['satlat'], a['satlng'], float(a.get('satalt', 0.0)),
-                b['satlat'], b['satlng'], float(b.get('satalt', 0.0))
-            )
-            if d <= threshold_km:
-                pairs.append((a, b, d))
-    return pairs
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    z = np.asarray(z, dtype=np.float64)
+    rows = np.flatnonzero(~np.isnan(x))
+    n = len(rows)
+    if n < 2:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, np.empty(0, dtype=np.float64)
+
+    if cKDTree is not None:
+        x = x[rows]
+        y = y[rows]
+        z = z[rows]
+        # Only neighbours inside the radius are visited: ~O(N log N).
+        tree = cKDTree(np.column_stack((x, y, z)))
+        idx = tree.query_pairs(r=threshold_km, output_type='ndarray')
+        ii = idx[:, 0]
+        jj = idx[:, 1]
+    else:
+        # |r_i - r_j| <= distance, so sorting by geocentric radius (R + alt)
+        # lets every scan skip pairs in different altitude shells (LEO vs GEO).
+        r = np.sqrt(x[rows] ** 2 + y[rows] ** 2 + z[rows] ** 2)
+        order = np.argsort(r, kind='stable')
+        rows = rows[order]
+        r = r[order]
+        x = x[rows]
+        y = y[rows]
+        z = z[rows]
+        if _close_pairs_kernel is not None:
+            # Streams pairs without materialising the N x N matrix.
+            ii, jj = _close_pairs_kernel(x, y, z, r, threshold_km)
+        elif find_close_pairs_c is not None:
+            # Same streaming scan in C with the GIL released.
+            idx = find_close_pairs_c(x, y, z, r, threshold_km)
+            ii = idx[:, 0]
+            jj = idx[:, 1]
+        else:
+            # Pure NumPy: candidate pairs from the sorted radius window only.
+            ii, jj = _radius_window_pairs(r, threshold_km)
+            d2 = (x[ii] - x[jj]) ** 2 + (y[ii] - y[jj]) ** 2 + (z[ii] - z[jj]) ** 2
+            hits = d2 <= threshold_km * threshold_km
+            ii = ii[hits]
+            jj = jj[hits]
+    dist = np.sqrt((x[ii] - x[jj]) ** 2 + (y[ii] - y[jj]) ** 2 + (z[ii] - z[jj]) ** 2)
+    a = rows[ii]
+    b = rows[jj]
+    return np.minimum(a, b), np.maximum(a, b), dist
@@ -0,0 +1,74 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# conj_c.pyx
+# Optional compiled versions of the conj.py distance helpers.
+# Build in place with:  python setup.py build_ext --inplace
+import numpy as np
+from libc.math cimport sin, cos, sqrt, atan2, M_PI
+
+cdef double R_EARTH_KM = 6371.0
+cdef double WGS84_A_KM = 6378.137
+cdef double WGS84_E2 = (1 / 298.257223563) * (2 - 1 / 298.257223563)
+cdef double DEG2RAD = M_PI / 180.0
+
+cpdef double haversine_km_c(double lat1, double lon1, double lat2, double lon2) noexcept nogil:
+    """Approx great-circle distance for lat/lon (km) – spherical Earth."""
+    cdef double sdlat = sin((lat2 - lat1) * DEG2RAD / 2)
+    cdef double sdlon = sin((lon2 - lon1) * DEG2RAD / 2)
+    cdef double a = sdlat * sdlat + cos(lat1 * DEG2RAD) * cos(lat2 * DEG2RAD) * sdlon * sdlon
+    return R_EARTH_KM * 2 * atan2(sqrt(a), sqrt(1 - a))
+
+cpdef double euclidean_km_c(double lat1, double lon1, double a1,
+                            double lat2, double lon2, double a2) noexcept nogil:
+    """WGS84 ECEF Euclidean distance (km) from geodetic lat/lon/alt."""
+    cdef double s1 = sin(lat1 * DEG2RAD), c1 = cos(lat1 * DEG2RAD), lam1 = lon1 * DEG2RAD
+    cdef double s2 = sin(lat2 * DEG2RAD), c2 = cos(lat2 * DEG2RAD), lam2 = lon2 * DEG2RAD
+    cdef double n1 = WGS84_A_KM / sqrt(1 - WGS84_E2 * s1 * s1)
+    cdef double n2 = WGS84_A_KM / sqrt(1 - WGS84_E2 * s2 * s2)
+    cdef double dx = (n1 + a1) * c1 * cos(lam1) - (n2 + a2) * c2 * cos(lam2)
+    cdef double dy = (n1 + a1) * c1 * sin(lam1) - (n2 + a2) * c2 * sin(lam2)
+    cdef double dz = (n1 * (1 - WGS84_E2) + a1) * s1 - (n2 * (1 - WGS84_E2) + a2) * s2
+    return sqrt(dx * dx + dy * dy + dz * dz)
+
+cdef Py_ssize_t _scan(const double[::1] x, const double[::1] y, const double[::1] z,
+                      const double[::1] r, double thr, Py_ssize_t[:, ::1] out) noexcept nogil:
+    """All pairs i<j within thr; writes them to out if it has rows. Returns hit count."""
+    cdef Py_ssize_t n = x.shape[0]
+    cdef Py_ssize_t i, j, k = 0
+    cdef bint write = out.shape[0] > 0
+    cdef double thr2 = thr * thr
+    cdef double xi, yi, zi, dx, dy, dz
+    for i in range(n):
+        xi = x[i]
+        yi = y[i]
+        zi = z[i]
+        for j in range(i + 1, n):
+            if r[j] - r[i] > thr:
+                break  # sorted by radius: the rest are in higher shells
+            dx = xi - x[j]
+            dy = yi - y[j]
+            dz = zi - z[j]
+            if dx * dx + dy * dy + dz * dz <= thr2:
+                if write:
+                    out[k, 0] = i
+                    out[k, 1] = j
+                k += 1
+    return k
+
+def find_close_pairs_c(const double[::1] x, const double[::1] y, const double[::1] z,
+                       const double[::1] r, double threshold_km):
+    """
+    x, y, z: contiguous float64 ECEF (km) arrays, sorted by geocentric radius r
+    returns (k, 2) intp array of row pairs (i < j) within threshold_km
+
+    Runs with the GIL released; a counting pass sizes the output, a second pass fills it.
+    """
+    cdef Py_ssize_t[:, ::1] no_out = np.empty((0, 2), dtype=np.intp)
+    cdef Py_ssize_t k
+    with nogil:
+        k = _scan(x, y, z, r, threshold_km, no_out)
+    out = np.empty((k, 2), dtype=np.intp)
+    cdef Py_ssize_t[:, ::1] out_v = out
+    if k:
+        with nogil:
+            _scan(x, y, z, r, threshold_km, out_v)
+    return out
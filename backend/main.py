@@ -1,22 +1,29 @@
 # main.py — FastAPI backend for Satellite Traffic Dashboard
 
 import asyncio
+import collections
+import math
 import os
 import time
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Set, Tuple, List
 
-import aiohttp
+import httpx
+import numpy as np
+import orjson
 import uvicorn
 from dotenv import load_dotenv
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+from sgp4.api import Satrec, SatrecArray
 
 from n2yo_client import above, positions, tle
-from conj import find_close_pairs
+from conj import find_close_pairs, warm_up
+from propagate import propagate, satrec_from_tle, tle_epoch
+from sat_table import SatTable, LEO, GEO
 
 BASE_DIR = Path(__file__).resolve().parent
 load_dotenv(BASE_DIR / ".env")
@@ -27,13 +34,16 @@ if not N2YO_API_KEY:
     print("WARNING: N2YO_API_KEY not set. Set it in .env file or environment variable.")
 
 # ---------- Config ----------
-API_POLL_INTERVAL = 5
+TLE_POLL_INTERVAL = 15  # Seconds between TLE fetch passes
 ABOVE_POLL_INTERVAL = 90  # Increased to reduce API calls and rate limit issues
-POSITIONS_SECONDS = 60
+PROPAGATE_INTERVAL = 1.0  # Seconds between local SGP4 position updates
+TLE_FETCH_PER_PASS = 4  # 4 per 15 s = 960/h, inside N2YO's 1000 /tle calls per hour
+TLE_MAX_AGE = 24 * 3600  # Seconds; older TLE epochs are refetched, at most once per this window
 LEO_MAX_ALT = 2000.0
 GEO_CATEGORY = 10
 PROXIMITY_THRESHOLD_KM = 5.0
 MAX_PARALLEL_REQUESTS = 4  # Limit parallel requests to avoid rate limits
+MAX_REQUESTS_PER_SECOND = 4  # N2YO request starts allowed per rolling second
 
 # /above radius in KM (for N2YO)
 ABOVE_SEARCH_RADIUS_KM = 5000  # Balanced: good coverage without being too slow
@@ -58,6 +68,17 @@ async def lifespan(app: FastAPI):
     if not FRONTEND_DIR.exists():
         print(f"WARNING: frontend directory not found at: {FRONTEND_DIR}")
 
+    # JIT-compile the conjunction kernel (if used) before the 1 Hz loop starts
+    warm_up()
+
+    # One keep-alive HTTP/2 client for every N2YO call; concurrent requests
+    # are multiplexed over a single TLS connection
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(30.0),
+        limits=httpx.Limits(max_connections=10),
+    )
+
     # Start broadcast immediately so frontend gets responses right away
     asyncio.create_task(broadcast_snapshot())
 
@@ -70,14 +91,15 @@ async def lifespan(app: FastAPI):
             await asyncio.sleep(2)  # Give server 2 seconds to start responding
             print("Starting satellite tracker loops...")
             asyncio.create_task(tracker_loop(N2YO_API_KEY))
-            asyncio.create_task(positions_loop(N2YO_API_KEY))
+            asyncio.create_task(tle_loop(N2YO_API_KEY))
+            asyncio.create_task(positions_loop())
 
         asyncio.create_task(delayed_start())
     else:
         print("WARNING: N2YO_API_KEY missing. Set env var or enable DEMO_MODE=1.")
 
     yield
-    # shutdown: nothing to clean up in serverless
+    await app.state.http.aclose()
 
 
 app = FastAPI(title="Sat Traffic Backend", lifespan=lifespan)
@@ -88,9 +110,31 @@ if FRONTEND_DIR.exists():
 else:
     print(f"INFO: frontend directory not found at {FRONTEND_DIR}; /static disabled")
 
-tracked: Dict[int, dict] = {}
+tracked = SatTable()
 clients: Set[WebSocket] = set()
 _last_n2yo_error: str | None = None
+_n2yo_sem = asyncio.Semaphore(MAX_PARALLEL_REQUESTS)  # caps in-flight N2YO requests
+_n2yo_starts: collections.deque = collections.deque()  # start times within the last second
+tle_cache: Dict[int, Satrec] = {}
+_tle_failed: Set[int] = set()
+_tle_fetched: Dict[int, float] = {}  # satid -> time its current (or evicted) TLE was fetched
+_tle_version = 0  # bumped whenever tle_cache changes so positions_loop rebuilds its SatrecArray
+_screen_cache: Tuple[int, list, list] = (-1, [], [0, 0])  # (tracked.version, alerts, counts)
+
+
+@asynccontextmanager
+async def _n2yo_slot():
+    """Guard one N2YO request: bounded concurrency plus a per-second token bucket."""
+    async with _n2yo_sem:
+        while True:
+            now = time.monotonic()
+            while _n2yo_starts and now - _n2yo_starts[0] >= 1.0:
+                _n2yo_starts.popleft()
+            if len(_n2yo_starts) < MAX_REQUESTS_PER_SECOND:
+                _n2yo_starts.append(now)
+                break
+            await asyncio.sleep(_n2yo_starts[0] + 1.0 - now)
+        yield
 
 # ----------------------------
 # Routes
@@ -129,23 +173,7 @@ async def api_snapshot():
     if DEMO_MODE or not N2YO_API_KEY:
         _ensure_demo_catalog()
         _demo_step(time.time())
-    sats = list(tracked.values())
-    pairs = find_close_pairs(sats, PROXIMITY_THRESHOLD_KM)
-    alert_pairs = [
-        {"a": p[0].get("satname"), "b": p[1].get("satname"), "dist_km": float(p[2])}
-        for p in pairs
-    ]
-    return {
-        "ts": datetime.utcnow().isoformat() + "Z",
-        "sats": sats,
-        "counts": {
-            "total": len(sats),
-            "leo": sum(1 for s in sats if s.get("category") == "LEO"),
-            "geo": sum(1 for s in sats if s.get("category") == "GEO"),
-            "alerts": len(alert_pairs),
-        },
-        "alerts": alert_pairs,
-    }
+    return Response(orjson.dumps(_snapshot_payload(), option=orjson.OPT_SERIALIZE_NUMPY), media_type="application/json")
 
 @app.get("/debug/n2yo")
 async def debug_n2yo(lat: float = 0.0, lng: float = 0.0, radius_km: int = ABOVE_SEARCH_RADIUS_KM):
@@ -154,8 +182,10 @@ async def debug_n2yo(lat: float = 0.0, lng: float = 0.0, radius_km: int = ABOVE_
     if not N2YO_API_KEY:
         return {"error": "N2YO_API_KEY not set"}
     try:
-        async with aiohttp.ClientSession() as s:
+        s = app.state.http
+        async with _n2yo_slot():
             geo = await above(s, N2YO_API_KEY, lat, lng, 0, radius_km, category=GEO_CATEGORY)
+        async with _n2yo_slot():
             allr = await above(s, N2YO_API_KEY, lat, lng, 0, radius_km, category=0)
         def shape(resp):
             if isinstance(resp, dict):
@@ -177,8 +207,8 @@ async def debug_tle(satid: int = 25544):
     if not N2YO_API_KEY:
         return {"error": "N2YO_API_KEY not set"}
     try:
-        async with aiohttp.ClientSession() as s:
-            t = await tle(s, N2YO_API_KEY, satid)
+        async with _n2yo_slot():
+            t = await tle(app.state.http, N2YO_API_KEY, satid)
         return JSONResponse(t)
     except Exception as e:
         return {"error": str(e)}
@@ -190,8 +220,8 @@ async def debug_positions(satid: int = 25544, seconds: int = 60):
     if not N2YO_API_KEY:
         return {"error": "N2YO_API_KEY not set"}
     try:
-        async with aiohttp.ClientSession() as s:
-            p = await positions(s, N2YO_API_KEY, satid, 0.0, 0.0, 0, seconds)
+        async with _n2yo_slot():
+            p = await positions(app.state.http, N2YO_API_KEY, satid, 0.0, 0.0, 0, seconds)
         return JSONResponse({
             "error": p.get("error"),
             "info": p.get("info"),
@@ -210,75 +240,53 @@ async def load_all_satellites():
         return {"error": "N2YO_API_KEY not set"}
     
     try:
-        async with aiohttp.ClientSession() as session:
-            now = time.time()
-            initial_count = len(tracked)
-            
-            # Parallelize all API calls
-            async def fetch_geo(lat, lng):
-                try:
+        session = app.state.http
+        now = time.time()
+        initial_count = len(tracked)
+        
+        # Parallelize all API calls
+        async def fetch_geo(lat, lng):
+            try:
+                async with _n2yo_slot():
                     return await above(session, N2YO_API_KEY, lat, lng, 0, ABOVE_SEARCH_RADIUS_KM, category=GEO_CATEGORY)
-                except Exception:
-                    return {}
-            
-            async def fetch_all(lat, lng):
-                try:
+            except Exception:
+                return {}
+        
+        async def fetch_all(lat, lng):
+            try:
+                async with _n2yo_slot():
                     return await above(session, N2YO_API_KEY, lat, lng, 0, ABOVE_SEARCH_RADIUS_KM, category=0)
-                except Exception:
-                    return {}
-            
-            geo_tasks = [fetch_geo(lat, lng) for lat, lng in ABOVE_SEEDS]
-            all_tasks = [fetch_all(lat, lng) for lat, lng in ABOVE_SEEDS]
-            
-            geo_responses, all_responses = await asyncio.gather(
-                asyncio.gather(*geo_tasks, return_exceptions=True),
-                asyncio.gather(*all_tasks, return_exceptions=True)
-            )
-            
-            # Process responses
-            for geo_resp in geo_responses:
-                if isinstance(geo_resp, Exception) or not isinstance(geo_resp, dict):
-                    continue
-                if not geo_resp.get("error"):
-                    for item in geo_resp.get("above", []):
-                        satid = int(item["satid"])
-                        tracked.setdefault(satid, {})
-                        tracked[satid].update({
-                            "satid": satid,
-                            "satname": item.get("satname"),
-                            "satlat": float(item.get("satlat")) if item.get("satlat") is not None else None,
-                            "satlng": float(item.get("satlng")) if item.get("satlng") is not None else None,
-                            "satalt": float(item.get("satalt", 0.0)),
-                            "category": "GEO",
-                            "last_update": now,
-                        })
-            
-            for all_resp in all_responses:
-                if isinstance(all_resp, Exception) or not isinstance(all_resp, dict):
-                    continue
-                if not all_resp.get("error"):
-                    for item in all_resp.get("above", []):
-                        alt = float(item.get("satalt", 0.0))
-                        if alt < LEO_MAX_ALT:
-                            satid = int(item["satid"])
-                            tracked.setdefault(satid, {})
-                            tracked[satid].update({
-                                "satid": satid,
-                                "satname": item.get("satname"),
-                                "satlat": float(item.get("satlat")) if item.get("satlat") is not None else None,
-                                "satlng": float(item.get("satlng")) if item.get("satlng") is not None else None,
-                                "satalt": alt,
-                                "category": "LEO",
-                                "last_update": now,
-                            })
-            
-            return JSONResponse({
-                "success": True,
-                "total_tracked": len(tracked),
-                "newly_loaded": len(tracked) - initial_count,
-                "leo_count": sum(1 for s in tracked.values() if s.get("category") == "LEO"),
-                "geo_count": sum(1 for s in tracked.values() if s.get("category") == "GEO"),
-            })
+            except Exception:
+                return {}
+        
+        # _n2yo_slot paces the requests; all of them are queued at once
+        async with asyncio.TaskGroup() as tg:
+            geo_tasks = [tg.create_task(fetch_geo(lat, lng)) for lat, lng in ABOVE_SEEDS]
+            all_tasks = [tg.create_task(fetch_all(lat, lng)) for lat, lng in ABOVE_SEEDS]
+        geo_responses = [t.result() for t in geo_tasks]
+        all_responses = [t.result() for t in all_tasks]
+        
+        # Process responses
+        for geo_resp in geo_responses:
+            if not isinstance(geo_resp, dict):
+                continue
+            if not geo_resp.get("error"):
+                _ingest_above(geo_resp.get("above", []), GEO, now)
+        
+        for all_resp in all_responses:
+            if not isinstance(all_resp, dict):
+                continue
+            if not all_resp.get("error"):
+                _ingest_above(all_resp.get("above", []), LEO, now)
+        
+        counts = tracked.category_counts()
+        return JSONResponse({
+            "success": True,
+            "total_tracked": len(tracked),
+            "newly_loaded": len(tracked) - initial_count,
+            "leo_count": counts[LEO],
+            "geo_count": counts[GEO],
+        })
     except Exception as e:
         return JSONResponse({"error": str(e)}, status_code=500)
 
@@ -297,183 +305,234 @@ async def stream(ws: WebSocket):
 # ----------------------------
 # N2YO-backed background tasks
 # ----------------------------
+def _ingest_above(items: list, category: int, now: float):
+    """
+    Upsert one /above response into `tracked` in a single vectorized pass (LEO keeps alt < LEO_MAX_ALT).
+    Satellites with a cached TLE only take name/category: their position comes from SGP4.
+    """
+    n = len(items)
+    if not n:
+        return
+    satid = np.fromiter((int(i["satid"]) for i in items), dtype=np.int64, count=n)
+    satlat = np.fromiter((np.nan if i.get("satlat") is None else float(i["satlat"]) for i in items), dtype=np.float64, count=n)
+    satlng = np.fromiter((np.nan if i.get("satlng") is None else float(i["satlng"]) for i in items), dtype=np.float64, count=n)
+    satalt = np.fromiter((float(i.get("satalt", 0.0)) for i in items), dtype=np.float64, count=n)
+    satname = [i.get("satname") for i in items]
+    if category == LEO:
+        keep = satalt < LEO_MAX_ALT
+        satid, satlat, satlng, satalt = satid[keep], satlat[keep], satlng[keep], satalt[keep]
+        satname = [name for name, k in zip(satname, keep.tolist()) if k]
+    has_tle = np.fromiter((s in tle_cache for s in satid.tolist()), dtype=bool, count=len(satid))
+    if has_tle.any():
+        tracked.update_meta_many(satid[has_tle], [name for name, k in zip(satname, has_tle.tolist()) if k], category)
+        rest = ~has_tle
+        satid, satlat, satlng, satalt = satid[rest], satlat[rest], satlng[rest], satalt[rest]
+        satname = [name for name, k in zip(satname, rest.tolist()) if k]
+    tracked.upsert_many(satid, satname, satlat, satlng, satalt, category, now)
+
+def _screen_conjunctions() -> Tuple[list, list]:
+    """(alert_pairs, category_counts) for the current positions, memoized on tracked.version."""
+    global _screen_cache
+    if _screen_cache[0] != tracked.version:
+        ii, jj, dist = find_close_pairs(tracked.ecef_x, tracked.ecef_y, tracked.ecef_z, PROXIMITY_THRESHOLD_KM)
+        names = tracked.satname
+        alert_pairs = [
+            {"a": names[i], "b": names[j], "dist_km": d}
+            for i, j, d in zip(ii.tolist(), jj.tolist(), dist.tolist())
+        ]
+        _screen_cache = (tracked.version, alert_pairs, tracked.category_counts())
+    return _screen_cache[1], _screen_cache[2]
+
+def _snapshot_payload() -> dict:
+    alert_pairs, counts = _screen_conjunctions()
+    return {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        "sats": tracked.to_columns(),
+        "counts": {
+            "total": len(tracked),
+            "leo": counts[LEO],
+            "geo": counts[GEO],
+            "alerts": len(alert_pairs),
+        },
+        "alerts": alert_pairs,
+    }
+
 async def broadcast_snapshot():
     # Send initial empty snapshot immediately so frontend doesn't wait
     await asyncio.sleep(0.1)  # Small delay to let WebSocket connections establish
+    sent_version = -1
+    frame = ""
+    synced: Set[WebSocket] = set()
     while True:
         try:
-            sats = list(tracked.values())
-            pairs = find_close_pairs(sats, PROXIMITY_THRESHOLD_KM)
-            alert_pairs = [
-                {"a": p[0].get("satname"), "b": p[1].get("satname"), "dist_km": float(p[2])}
-                for p in pairs
-            ]
-            payload = {
-                "ts": datetime.utcnow().isoformat() + "Z",
-                "sats": sats,
-                "counts": {
-                    "total": len(sats),
-                    "leo": sum(1 for s in sats if s.get("category") == "LEO"),
-                    "geo": sum(1 for s in sats if s.get("category") == "GEO"),
-                    "alerts": len(alert_pairs),
-                },
-                "alerts": alert_pairs,
-            }
+            # Serialize once per change; unchanged ticks only reach new clients
+            if tracked.version != sent_version:
+                sent_version = tracked.version
+                frame = orjson.dumps(
+                    {"type": "snapshot", "data": _snapshot_payload()}, option=orjson.OPT_SERIALIZE_NUMPY
+                ).decode()
+                synced = set()
             dead = []
-            for ws in set(clients):
+            for ws in set(clients) - synced:
                 try:
-                    await ws.send_json({"type": "snapshot", "data": payload})
+                    await ws.send_text(frame)
+                    synced.add(ws)
                 except Exception:
                     dead.append(ws)
             for d in dead:
                 clients.discard(d)
+            synced &= clients
         except Exception as e:
             print("broadcast error:", e)
         await asyncio.sleep(1.0)
 
 async def tracker_loop(api_key: str):
-    async with aiohttp.ClientSession() as session:
-        while True:
-            try:
-                global _last_n2yo_error
-                _last_n2yo_error = None
-                now = time.time()
-                
-                # Parallelize all API calls for much faster loading
-                async def fetch_geo(lat, lng):
-                    try:
+    session = app.state.http
+    while True:
+        try:
+            global _last_n2yo_error
+            _last_n2yo_error = None
+            now = time.time()
+            
+            # Parallelize all API calls for much faster loading
+            async def fetch_geo(lat, lng):
+                try:
+                    async with _n2yo_slot():
                         return await above(session, api_key, lat, lng, 0, ABOVE_SEARCH_RADIUS_KM, category=GEO_CATEGORY)
-                    except Exception as e:
-                        print(f"GEO fetch error for ({lat}, {lng}): {e}")
-                        return {}
-                
-                async def fetch_all(lat, lng):
-                    try:
+                except Exception as e:
+                    print(f"GEO fetch error for ({lat}, {lng}): {e}")
+                    return {}
+            
+            async def fetch_all(lat, lng):
+                try:
+                    async with _n2yo_slot():
                         return await above(session, api_key, lat, lng, 0, ABOVE_SEARCH_RADIUS_KM, category=0)
-                    except Exception as e:
-                        print(f"ALL fetch error for ({lat}, {lng}): {e}")
-                        return {}
-                
-                # Fetch in batches to avoid rate limits
-                geo_responses = []
-                all_responses = []
-                
-                # Process in batches of MAX_PARALLEL_REQUESTS
-                for i in range(0, len(ABOVE_SEEDS), MAX_PARALLEL_REQUESTS):
-                    batch = ABOVE_SEEDS[i:i + MAX_PARALLEL_REQUESTS]
-                    geo_batch = [fetch_geo(lat, lng) for lat, lng in batch]
-                    all_batch = [fetch_all(lat, lng) for lat, lng in batch]
-                    
-                    batch_geo = await asyncio.gather(*geo_batch, return_exceptions=True)
-                    batch_all = await asyncio.gather(*all_batch, return_exceptions=True)
-                    
-                    geo_responses.extend(batch_geo)
-                    all_responses.extend(batch_all)
-                    
-                    # Small delay between batches to respect rate limits
-                    if i + MAX_PARALLEL_REQUESTS < len(ABOVE_SEEDS):
-                        await asyncio.sleep(0.5)  # Reduced from 1.0 to 0.5 for faster loading
-                
-                # Process GEO responses
-                for geo_resp in geo_responses:
-                    if isinstance(geo_resp, Exception):
-                        continue
-                    if isinstance(geo_resp, dict) and geo_resp.get("error"):
-                        error_msg = geo_resp.get("error", "")
-                        _last_n2yo_error = error_msg
-                        if "exceeded" in error_msg.lower() or "rate limit" in error_msg.lower():
-                            print(f"Rate limit hit! Skipping remaining requests.")
-                            break
-                    for item in geo_resp.get("above", []) if isinstance(geo_resp, dict) else []:
-                        satid = int(item["satid"])
-                        tracked.setdefault(satid, {})
-                        tracked[satid].update({
-                            "satid": satid,
-                            "satname": item.get("satname"),
-                            "satlat": float(item.get("satlat")) if item.get("satlat") is not None else None,
-                            "satlng": float(item.get("satlng")) if item.get("satlng") is not None else None,
-                            "satalt": float(item.get("satalt", 0.0)),
-                            "category": "GEO",
-                            "last_update": now,
-                        })
-                
-                # Process ALL responses (filter to LEO)
-                for all_resp in all_responses:
-                    if isinstance(all_resp, Exception):
-                        continue
-                    if isinstance(all_resp, dict) and all_resp.get("error"):
-                        error_msg = all_resp.get("error", "")
-                        _last_n2yo_error = error_msg
-                        if "exceeded" in error_msg.lower() or "rate limit" in error_msg.lower():
-                            print(f"Rate limit hit! Skipping remaining requests.")
-                            break
-                    for item in all_resp.get("above", []) if isinstance(all_resp, dict) else []:
-                        alt = float(item.get("satalt", 0.0))
-                        if alt < LEO_MAX_ALT:
-                            satid = int(item["satid"])
-                            tracked.setdefault(satid, {})
-                            tracked[satid].update({
-                                "satid": satid,
-                                "satname": item.get("satname"),
-                                "satlat": float(item.get("satlat")) if item.get("satlat") is not None else None,
-                                "satlng": float(item.get("satlng")) if item.get("satlng") is not None else None,
-                                "satalt": alt,
-                                "category": "LEO",
-                                "last_update": now,
-                            })
-
-                print(f"tracker_loop: tracked={len(tracked)}; n2yo_error={_last_n2yo_error}")
-            except Exception as e:
-                print("Error refreshing above lists:", e)
-            await asyncio.sleep(ABOVE_POLL_INTERVAL)
-
-async def positions_loop(api_key: str):
-    async with aiohttp.ClientSession() as session:
-        while True:
-            try:
-                sats = list(tracked.keys())
-                max_fetch = 10000  # Increased from 200 to load all tracked satellites
+                except Exception as e:
+                    print(f"ALL fetch error for ({lat}, {lng}): {e}")
+                    return {}
+            
+            # _n2yo_slot paces the requests; all of them are queued at once
+            async with asyncio.TaskGroup() as tg:
+                geo_tasks = [tg.create_task(fetch_geo(lat, lng)) for lat, lng in ABOVE_SEEDS]
+                all_tasks = [tg.create_task(fetch_all(lat, lng)) for lat, lng in ABOVE_SEEDS]
+            geo_responses = [t.result() for t in geo_tasks]
+            all_responses = [t.result() for t in all_tasks]
+            
+            # Process GEO responses
+            for geo_resp in geo_responses:
+                if not isinstance(geo_resp, dict):
+                    continue  # above() returns whatever JSON N2YO sent
+                if geo_resp.get("error"):
+                    error_msg = geo_resp.get("error", "")
+                    _last_n2yo_error = error_msg
+                    if "exceeded" in error_msg.lower() or "rate limit" in error_msg.lower():
+                        print("Rate limit hit! Ignoring remaining GEO responses.")
+                        break
+                _ingest_above(geo_resp.get("above", []), GEO, now)
+            
+            # Process ALL responses (filter to LEO)
+            for all_resp in all_responses:
+                if not isinstance(all_resp, dict):
+                    continue
+                if all_resp.get("error"):
+                    error_msg = all_resp.get("error", "")
+                    _last_n2yo_error = error_msg
+                    if "exceeded" in error_msg.lower() or "rate limit" in error_msg.lower():
+                        print("Rate limit hit! Ignoring remaining LEO responses.")
+                        break
+                _ingest_above(all_resp.get("above", []), LEO, now)
+
+            print(f"tracker_loop: tracked={len(tracked)}; n2yo_error={_last_n2yo_error}")
+        except Exception as e:
+            print("Error refreshing above lists:", e)
+        await asyncio.sleep(ABOVE_POLL_INTERVAL)
+
+async def tle_loop(api_key: str):
+    """
+    Fetch TLEs so positions can be propagated locally: missing ones first,
+    then cached ones whose epoch is older than TLE_MAX_AGE.
+    """
+    global _last_n2yo_error, _tle_version
+    session = app.state.http
+
+    async def fetch_tle(satid):
+        try:
+            async with _n2yo_slot():
+                resp = await tle(session, api_key, satid)
+        except Exception as e:
+            # timeout, connection reset, non-200: transient, retry on a later pass
+            print(f"TLE fetch error for {satid}:", e)
+            return satid, None, str(e)
+        if not isinstance(resp, dict):
+            return satid, None, f"unexpected /tle response for {satid}"
+        if resp.get("error"):
+            return satid, None, resp.get("error")
+        try:
+            return satid, satrec_from_tle(resp.get("tle") or ""), None
+        except Exception as e:
+            # missing, null or malformed TLE: refetching returns the same text.
+            # Never raise here: an escaping error would cancel the whole TaskGroup pass.
+            print(f"TLE parse error for {satid}:", e)
+            return satid, None, None
+
+    while True:
+        try:
+            now = time.time()
+            due = [
+                s for s in tracked.ids()
+                if s not in _tle_failed
+                and now - _tle_fetched.get(s, 0.0) >= TLE_MAX_AGE
+                and (s not in tle_cache or now - tle_epoch(tle_cache[s]) > TLE_MAX_AGE)
+            ]
+            due.sort(key=tle_cache.__contains__)  # stable: missing TLEs before stale ones
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(fetch_tle(s)) for s in due[:TLE_FETCH_PER_PASS]]
+            results = [t.result() for t in tasks]
+            for satid, rec, error_msg in results:
+                if rec is not None:
+                    tle_cache[satid] = rec
+                    _tle_fetched[satid] = now
+                    _tle_version += 1
+                elif error_msg:
+                    # API or transport error (rate limit, 5xx, timeout): retry on a later pass
+                    _last_n2yo_error = error_msg
+                else:
+                    _tle_failed.add(satid)
+        except Exception as e:
+            print("TLE loop error:", e)
+        await asyncio.sleep(TLE_POLL_INTERVAL)
+
+async def positions_loop():
+    """
+    Propagate every satellite with a cached TLE through SGP4 in one call per tick (no network).
+    TLEs SGP4 rejects (e.g. decayed orbits) are evicted so /above positions take over again.
+    """
+    global _tle_version
+    prop_version = -1
+    prop_ids: List[int] = []
+    prop_rows = np.empty(0, dtype=np.intp)
+    prop_arr = None
+    while True:
+        try:
+            if prop_version != _tle_version:
+                prop_version = _tle_version
+                prop_ids = list(tle_cache)
+                prop_rows = np.array([tracked.id_to_row[s] for s in prop_ids], dtype=np.intp)
+                prop_arr = SatrecArray([tle_cache[s] for s in prop_ids])
+            if prop_ids:
                 now = time.time()
-                
-                # Process in batches with parallel requests for speed
-                batch_size = 50  # Process 50 satellites in parallel
-                sats_to_update = sats[:max_fetch]
-                
-                async def update_position(satid):
-                    try:
-                        resp = await positions(session, api_key, satid, 0.0, 0.0, 0, POSITIONS_SECONDS)
-                        if isinstance(resp, dict) and resp.get("error"):
-                            global _last_n2yo_error
-                            _last_n2yo_error = resp.get("error")
-                            return None
-                        pos_arr = resp.get("positions", [])
-                        if pos_arr:
-                            latest = pos_arr[0]
-                            return (satid, {
-                                "satlat": float(latest.get("satlatitude")) if latest.get("satlatitude") is not None else None,
-                                "satlng": float(latest.get("satlongitude")) if latest.get("satlongitude") is not None else None,
-                                "satalt": float(latest.get("sataltitude", 0.0)),
-                                "last_update": now,
-                            })
-                    except Exception as e:
-                        print(f"positions error for {satid}:", e)
-                    return None
-                
-                # Process in batches
-                for i in range(0, len(sats_to_update), batch_size):
-                    batch = sats_to_update[i:i + batch_size]
-                    results = await asyncio.gather(*[update_position(satid) for satid in batch], return_exceptions=True)
-                    for result in results:
-                        if result and isinstance(result, tuple):
-                            satid, updates = result
-                            if satid in tracked:
-                                tracked[satid].update(updates)
-                    # Small delay between batches to avoid rate limiting
-                    if i + batch_size < len(sats_to_update):
-                        await asyncio.sleep(0.1)
-            except Exception as e:
-                print("positions loop error:", e)
-            await asyncio.sleep(API_POLL_INTERVAL)
+                lat, lng, alt, ok = propagate(prop_arr, now)
+                tracked.set_positions(prop_rows[ok], lat[ok], lng[ok], alt[ok], now)
+                if not ok.all():
+                    # _tle_fetched is kept, so tle_loop retries these after TLE_MAX_AGE
+                    bad = [s for s, good in zip(prop_ids, ok.tolist()) if not good]
+                    for s in bad:
+                        del tle_cache[s]
+                    _tle_version += 1
+                    print(f"positions loop: SGP4 rejected {len(bad)} TLE(s), evicted: {bad[:10]}")
+        except Exception as e:
+            print("positions loop error:", e)
+        await asyncio.sleep(PROPAGATE_INTERVAL)
 
 # ----------------------------
 # DEMO simulator (no external APIs)
@@ -484,28 +543,26 @@ def _ensure_demo_catalog():
     now = time.time()
     # 12 GEO evenly spaced
     for i in range(12):
-        satid = 900000 + i
-        tracked[satid] = {
-            "satid": satid,
-            "satname": f"GEO-{i+1:02d}",
-            "satlat": 0.0,
-            "satlng": i * 30.0,    # degrees
-            "satalt": 35786.0,     # km
-            "category": "GEO",
-            "last_update": now,
-        }
+        tracked.upsert(
+            900000 + i,
+            f"GEO-{i+1:02d}",
+            0.0,
+            i * 30.0,    # degrees
+            35786.0,     # km
+            GEO,
+            now,
+        )
     # 30 LEO with different inclinations
     for i in range(30):
-        satid = 910000 + i
-        tracked[satid] = {
-            "satid": satid,
-            "satname": f"LEO-{i+1:02d}",
-            "satlat": (i % 6) * 10 - 25,   # -25..25 deg
-            "satlng": (i * 12) % 360,
-            "satalt": 550.0,
-            "category": "LEO",
-            "last_update": now,
-        }
+        tracked.upsert(
+            910000 + i,
+            f"LEO-{i+1:02d}",
+            (i % 6) * 10 - 25,   # -25..25 deg
+            (i * 12) % 360,
+            550.0,
+            LEO,
+            now,
+        )
 
 async def demo_loop():
     _ensure_demo_catalog()
@@ -514,21 +571,29 @@ async def demo_loop():
         await asyncio.sleep(1.0)
 
 def _demo_step(now: float):
-    """Advance demo satellites one step based on wall-clock time."""
+    """
+    Advance demo satellites to wall-clock time `now`, quantized to whole
+    seconds: repeat /api/snapshot polls within a second find every row
+    already at that tick, skip the step and reuse the screened snapshot.
+    """
+    now = float(math.floor(now))
     omega_geo = 360.0 / (24 * 3600)         # deg per second
     omega_leo = 360.0 / (95 * 60)           # ~95 min orbit
-    for s in tracked.values():
-        last = float(s.get("last_update") or now)
-        dt = max(0.0, now - last)
-        if s.get("category") == "GEO":
-            s["satlng"] = (float(s.get("satlng") or 0.0) + omega_geo * dt) % 360.0
-            s["satlat"] = 0.0
-        else:
-            s["satlng"] = (float(s.get("satlng") or 0.0) + omega_leo * dt) % 360.0
-            # small latitude oscillation based on absolute time
-            t = now % (95 * 60)
-            s["satlat"] = 30.0 * __import__("math").sin(2 * __import__("math").pi * t / (95 * 60))
-        s["last_update"] = now
+    leo_period = 95 * 60
+    last = tracked.last_update
+    if (last == now).all():
+        return  # same tick: tracked.version is unchanged, so _screen_cache still hits
+    dt = np.maximum(0.0, now - np.where(last > 0, last, now))
+    lng = np.nan_to_num(tracked.satlng, nan=0.0)
+    is_geo = tracked.category == GEO
+    is_leo = ~is_geo
+    tracked.satlng[is_geo] = (lng[is_geo] + omega_geo * dt[is_geo]) % 360.0
+    tracked.satlat[is_geo] = 0.0
+    tracked.satlng[is_leo] = (lng[is_leo] + omega_leo * dt[is_leo]) % 360.0
+    # small latitude oscillation based on absolute time (same for every LEO)
+    tracked.satlat[is_leo] = 30.0 * math.sin(2 * math.pi * (now % leo_period) / leo_period)
+    tracked.last_update[:] = now
+    tracked.refresh_ecef()
 
 # ----------------------------
 # Entrypoint
@@ -1,30 +1,37 @@
 # n2yo_client.py
 # Small client to call N2YO endpoints used by the dashboard.
-import aiohttp
+from functools import lru_cache
 from typing import Any
+from urllib.parse import quote, urlencode
+
+import httpx
 
 BASE = "https://api.n2yo.com/rest/v1/satellite"
 
-async def call_n2yo(session: aiohttp.ClientSession, path: str, api_key: str, params: dict = None) -> Any:
-    if params is None:
-        params = {}
-    params['apiKey'] = api_key
-    url = f"{BASE}/{path}"
-    async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as resp:
-        text = await resp.text()
-        if resp.status != 200:
-            raise RuntimeError(f"N2YO error {resp.status}: {text}")
-        return await resp.json()
+@lru_cache(maxsize=None)
+def _api_qs(api_key: str) -> str:
+    # Encoded once per key instead of rebuilding a params dict on every call
+    return "?apiKey=" + quote(api_key, safe="")
+
+async def call_n2yo(session: httpx.AsyncClient, path: str, api_key: str, params: dict = None) -> Any:
+    url = BASE + "/" + path + _api_qs(api_key)
+    if params:
+        url += "&" + urlencode(params)
+    # Timeout, pooling and HTTP/2 multiplexing come from the shared client
+    resp = await session.get(url)
+    if resp.status_code != 200:
+        raise RuntimeError(f"N2YO error {resp.status_code}: {resp.text}")
+    return resp.json()
 
-async def above(session: aiohttp.ClientSession, api_key: str, lat: float, lng: float, alt: int, radius: int, category: int = 0):
+async def above(session: httpx.AsyncClient, api_key: str, lat: float, lng: float, alt: int, radius: int, category: int = 0):
     # /above/{lat}/{lng}/{alt}/{search_radius}/{category_id}/
-    path = f"above/{lat}/{lng}/{alt}/{radius}/{category}/"
+    path = "/".join(("above", str(lat), str(lng), str(alt), str(radius), str(category), ""))
     return await call_n2yo(session, path, api_key)
 
-async def positions(session: aiohttp.ClientSession, api_key: str, satid: int, observer_lat: float, observer_lng: float, observer_alt: int, seconds: int):
+async def positions(session: httpx.AsyncClient, api_key: str, satid: int, observer_lat: float, observer_lng: float, observer_alt: int, seconds: int):
     # /positions/{id}/{observer_lat}/{observer_lng}/{observer_alt}/{seconds}/
-    path = f"positions/{satid}/{observer_lat}/{observer_lng}/{observer_alt}/{seconds}/"
+    path = "/".join(("positions", str(satid), str(observer_lat), str(observer_lng), str(observer_alt), str(seconds), ""))
+    return await call_n2yo(session, path, api_key)
+async def tle(session: httpx.AsyncClient, api_key: str, satid: int):
+    path = "tle/" + str(satid) + "/"
     return await call_n2yo(session, path, api_key)
-async def tle(session: aiohttp.ClientSession, api_key: str, satid: int):
-    path = f"tle/{satid}/"
-    return await call_n2yo(session, path, api_key)
\ No newline at end of file
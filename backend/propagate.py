@@ -0,0 +1,54 @@
+# propagate.py
+# Local SGP4 propagation of cached TLEs (replaces per-satellite /positions polling).
+import math
+import time
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, jday
+
+from conj import ecef_to_geodetic_np
+
+
+def satrec_from_tle(tle_text: str) -> Satrec:
+    """Parse N2YO's "line1\\r\\nline2" TLE string."""
+    line1, line2 = tle_text.strip().splitlines()[:2]
+    return Satrec.twoline2rv(line1.strip(), line2.strip())
+
+
+def tle_epoch(sat: Satrec) -> float:
+    """Unix time of the TLE epoch."""
+    return (sat.jdsatepoch - 2440587.5 + sat.jdsatepochF) * 86400.0
+
+
+def _gmst_rad(jd: float, fr: float) -> float:
+    """Greenwich mean sidereal time (IAU-82), UT1 ~ UTC."""
+    tut1 = (jd - 2451545.0 + fr) / 36525.0
+    gmst_s = (67310.54841
+              + (876600.0 * 3600 + 8640184.812866) * tut1
+              + 0.093104 * tut1 ** 2
+              - 6.2e-6 * tut1 ** 3)
+    return (gmst_s * (2 * math.pi / 86400.0)) % (2 * math.pi)
+
+
+def propagate(sats: SatrecArray, now: float):
+    """
+    Propagate every satellite in `sats` to unix time `now`.
+
+    returns (lat_deg, lng_deg, alt_km, ok) arrays. Lat/lng/alt are WGS84
+    geodetic, the datum N2YO reports and conj.to_ecef expects;
+    ok is False where SGP4 reported an error (e.g. decayed orbit).
+    """
+    t = time.gmtime(now)
+    jd, fr = jday(t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec + (now % 1.0))
+    err, r, _v = sats.sgp4(np.array([jd]), np.array([fr]))
+    r = r[:, 0, :]  # (n, 3) TEME km
+
+    # TEME -> Earth-fixed: rotate about z by GMST (polar motion ignored)
+    g = _gmst_rad(jd, fr)
+    cg, sg = math.cos(g), math.sin(g)
+    x = cg * r[:, 0] + sg * r[:, 1]
+    y = -sg * r[:, 0] + cg * r[:, 1]
+    z = r[:, 2]
+
+    lat, lng, alt = ecef_to_geodetic_np(x, y, z)
+    return lat, lng, alt, err[:, 0] == 0
@@ -0,0 +1,215 @@
+# sat_table.py
+# Struct-of-arrays store for tracked satellites.
+import numpy as np
+
+from conj import to_ecef, to_ecef_np
+
+# Category codes stored in SatTable.category
+LEO = 0
+GEO = 1
+CATEGORY_NAMES = ("LEO", "GEO")
+
+
+class SatTable:
+    """
+    Tracked satellites as parallel NumPy arrays (one row per satellite).
+
+    Positions live in float32 arrays (NaN when unknown), so numeric kernels
+    such as conjunction screening and the demo simulator work on whole
+    columns. Row order is insertion order; `id_to_row` maps satid -> row.
+
+    ECEF x/y/z (float64) is cached next to lat/lng/alt and refreshed at every
+    write, so conjunction screening never recomputes trig per pair.
+    `version` is bumped on every write so consumers can skip unchanged ticks.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.n = 0
+        self.version = 0
+        self.id_to_row: dict[int, int] = {}
+        self.satname: list[str] = []
+        self._satid = np.zeros(capacity, dtype=np.int64)
+        self._satlat = np.full(capacity, np.nan, dtype=np.float32)
+        self._satlng = np.full(capacity, np.nan, dtype=np.float32)
+        self._satalt = np.zeros(capacity, dtype=np.float32)
+        self._last_update = np.zeros(capacity, dtype=np.float64)
+        self._category = np.zeros(capacity, dtype=np.uint8)
+        self._ecef_x = np.full(capacity, np.nan, dtype=np.float64)
+        self._ecef_y = np.full(capacity, np.nan, dtype=np.float64)
+        self._ecef_z = np.full(capacity, np.nan, dtype=np.float64)
+
+    # ---- column views (length n, writable) ----
+    @property
+    def satid(self) -> np.ndarray:
+        return self._satid[:self.n]
+
+    @property
+    def satlat(self) -> np.ndarray:
+        return self._satlat[:self.n]
+
+    @property
+    def satlng(self) -> np.ndarray:
+        return self._satlng[:self.n]
+
+    @property
+    def satalt(self) -> np.ndarray:
+        return self._satalt[:self.n]
+
+    @property
+    def last_update(self) -> np.ndarray:
+        return self._last_update[:self.n]
+
+    @property
+    def category(self) -> np.ndarray:
+        return self._category[:self.n]
+
+    @property
+    def ecef_x(self) -> np.ndarray:
+        return self._ecef_x[:self.n]
+
+    @property
+    def ecef_y(self) -> np.ndarray:
+        return self._ecef_y[:self.n]
+
+    @property
+    def ecef_z(self) -> np.ndarray:
+        return self._ecef_z[:self.n]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __contains__(self, satid) -> bool:
+        return satid in self.id_to_row
+
+    def _grow(self, need: int):
+        cap = len(self._satid)
+        if need <= cap:
+            return
+        cap = max(cap, 1)  # capacity=0 would never double
+        while cap < need:
+            cap *= 2
+        for name in ("_satid", "_satlat", "_satlng", "_satalt", "_last_update", "_category",
+                     "_ecef_x", "_ecef_y", "_ecef_z"):
+            old = getattr(self, name)
+            new = np.full(cap, np.nan, dtype=old.dtype) if old.dtype.kind == "f" else np.zeros(cap, dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def upsert(self, satid: int, satname, satlat, satlng, satalt: float, category: int, now: float) -> int:
+        """Insert or overwrite one satellite; returns its row."""
+        row = self.id_to_row.get(satid)
+        if row is None:
+            row = self.n
+            self._grow(row + 1)
+            self.n += 1
+            self.id_to_row[satid] = row
+            self.satname.append(satname)
+            self._satid[row] = satid
+        else:
+            self.satname[row] = satname
+        self._category[row] = category
+        self._set_position(row, satlat, satlng, satalt, now)
+        return row
+
+    def upsert_many(self, satid: np.ndarray, satname: list, satlat, satlng, satalt, category: int, now: float):
+        """Vectorized upsert: existing ids are updated in place, new ids appended as one block."""
+        satid = np.asarray(satid, dtype=np.int64)
+        if not len(satid):
+            return
+        # duplicate ids: first occurrence fixes the row order, last one the values,
+        # exactly like repeated upsert() calls
+        _, first = np.unique(satid, return_index=True)
+        _, last_rev = np.unique(satid[::-1], return_index=True)
+        pick = (len(satid) - 1 - last_rev)[np.argsort(first)]
+        satid = satid[pick]
+        satname = [satname[k] for k in pick.tolist()]
+
+        known = np.isin(satid, self.satid)
+        rows = np.empty(len(satid), dtype=np.intp)
+        rows[known] = [self.id_to_row[s] for s in satid[known].tolist()]
+        for row, k in zip(rows[known].tolist(), np.flatnonzero(known).tolist()):
+            self.satname[row] = satname[k]
+
+        new = np.flatnonzero(~known)
+        start = self.n
+        self._grow(start + len(new))
+        self.n += len(new)
+        rows[new] = np.arange(start, self.n)
+        self._satid[start:self.n] = satid[new]
+        self.id_to_row.update(zip(satid[new].tolist(), range(start, self.n)))
+        self.satname.extend(satname[k] for k in new.tolist())
+
+        self._category[rows] = category
+        self.set_positions(rows, np.asarray(satlat)[pick], np.asarray(satlng)[pick], np.asarray(satalt)[pick], now)
+
+    def update_meta_many(self, satid: np.ndarray, satname: list, category: int):
+        """Rename/recategorize known ids without touching positions; unknown ids are ignored."""
+        changed = False
+        for s, name in zip(np.asarray(satid, dtype=np.int64).tolist(), satname):
+            row = self.id_to_row.get(s)
+            if row is None:
+                continue
+            if self.satname[row] != name or self._category[row] != category:
+                self.satname[row] = name
+                self._category[row] = category
+                changed = True
+        if changed:
+            self.version += 1
+
+    def set_positions(self, rows: np.ndarray, satlat, satlng, satalt, now: float):
+        """Write positions for many rows at once and refresh their cached ECEF."""
+        self._satlat[rows] = satlat
+        self._satlng[rows] = satlng
+        self._satalt[rows] = satalt
+        self._last_update[rows] = now
+        x, y, z = to_ecef_np(self._satlat[rows], self._satlng[rows], self._satalt[rows])
+        self._ecef_x[rows] = x
+        self._ecef_y[rows] = y
+        self._ecef_z[rows] = z
+        self.version += 1
+
+    def _set_position(self, row: int, satlat, satlng, satalt: float, now: float):
+        self._satlat[row] = np.nan if satlat is None else float(satlat)
+        self._satlng[row] = np.nan if satlng is None else float(satlng)
+        self._satalt[row] = satalt
+        self._last_update[row] = now
+        self.version += 1
+        if satlat is None or satlng is None:
+            self._ecef_x[row] = self._ecef_y[row] = self._ecef_z[row] = np.nan
+        else:
+            # from the stored float32 values so ECEF matches what is served
+            self._ecef_x[row], self._ecef_y[row], self._ecef_z[row] = to_ecef(
+                float(self._satlat[row]), float(self._satlng[row]), float(self._satalt[row])
+            )
+
+    def refresh_ecef(self):
+        """Recompute cached ECEF after bulk in-place edits of the lat/lng/alt columns."""
+        x, y, z = to_ecef_np(self.satlat, self.satlng, self.satalt)
+        self.ecef_x[:] = x
+        self.ecef_y[:] = y
+        self.ecef_z[:] = z
+        self.version += 1
+
+    def ids(self) -> list[int]:
+        return self.satid.tolist()
+
+    def category_counts(self) -> list[int]:
+        """Satellites per category code, indexed by LEO/GEO, in one pass."""
+        return np.bincount(self.category, minlength=len(CATEGORY_NAMES)).tolist()
+
+    def to_columns(self) -> dict:
+        """
+        Columnar snapshot for orjson.OPT_SERIALIZE_NUMPY: arrays are encoded
+        straight from their buffers (NaN -> null). `category` holds the codes,
+        `category_names` maps them back to "LEO"/"GEO".
+        """
+        return {
+            "satid": self.satid,
+            "satname": self.satname,
+            "satlat": self.satlat,
+            "satlng": self.satlng,
+            "satalt": self.satalt,
+            "category": self.category,
+            "category_names": CATEGORY_NAMES,
+            "last_update": self.last_update,
+        }
@@ -0,0 +1,11 @@
+# setup.py
+# Builds the optional conj_c extension (compiled distance helpers) in place:
+#   pip install cython && python setup.py build_ext --inplace
+# conj.py falls back to pure Python/NumPy when the extension is not built.
+from Cython.Build import cythonize
+from setuptools import setup
+
+setup(
+    name="sat-traffic-conj-c",
+    ext_modules=cythonize("conj_c.pyx"),
+)
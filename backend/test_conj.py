@@ -0,0 +1,98 @@
+# test_conj.py
+# Every pair-scan path must return the brute-force pair set; SGP4 propagation
+# is checked against Skyfield when it is installed.
+import numpy as np
+import pytest
+
+import conj
+from conj import find_close_pairs, to_ecef_np
+
+THRESHOLD_KM = 50.0
+
+
+def _cloud(n=600, seed=1):
+    """LEO shell plus a GEO ring, dense enough to produce close pairs, with some NaN rows."""
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(-5, 5, size=n)
+    lng = rng.uniform(-5, 5, size=n)
+    alt = np.where(rng.random(n) < 0.8, rng.uniform(400, 450, size=n), 35786.0)
+    lat[::37] = np.nan
+    return to_ecef_np(lat, lng, alt)
+
+
+def _brute_force(x, y, z, thr):
+    rows = np.flatnonzero(~np.isnan(x))
+    p = np.column_stack((x[rows], y[rows], z[rows]))
+    d = np.sqrt(((p[:, None, :] - p[None, :, :]) ** 2).sum(axis=-1))
+    ii, jj = np.nonzero(np.triu(d <= thr, k=1))
+    return {(int(rows[i]), int(rows[j])): d[i, j] for i, j in zip(ii, jj)}
+
+
+def _pairs(i, j, d):
+    return dict(zip(zip(i.tolist(), j.tolist()), d.tolist()))
+
+
+def _paths():
+    yield "radius_window", dict(cKDTree=None, _close_pairs_kernel=None, find_close_pairs_c=None)
+    if conj.cKDTree is not None:
+        yield "kdtree", {}
+    if conj._close_pairs_kernel is not None:
+        yield "numba", dict(cKDTree=None)
+    if conj.find_close_pairs_c is not None:
+        yield "cython", dict(cKDTree=None, _close_pairs_kernel=None)
+
+
+@pytest.mark.parametrize("name,patch", list(_paths()), ids=[p[0] for p in _paths()])
+def test_find_close_pairs_matches_brute_force(monkeypatch, name, patch):
+    for attr, value in patch.items():
+        monkeypatch.setattr(conj, attr, value)
+    x, y, z = _cloud()
+    expected = _brute_force(x, y, z, THRESHOLD_KM)
+    got = _pairs(*find_close_pairs(x, y, z, THRESHOLD_KM))
+    assert expected  # the cloud must actually exercise the scan
+    assert got.keys() == expected.keys()
+    for key, dist in expected.items():
+        assert got[key] == pytest.approx(dist, abs=1e-9)
+
+
+def test_find_close_pairs_fewer_than_two():
+    i, j, d = find_close_pairs([np.nan, 1.0], [0.0, 0.0], [0.0, 0.0])
+    assert len(i) == len(j) == len(d) == 0
+
+
+ISS_TLE = (
+    "1 25544U 98067A   19343.69339541  .00001764  00000-0  38792-4 0  9991\r\n"
+    "2 25544  51.6439 211.2001 0007417  17.6667  85.6398 15.50103472202482"
+)
+
+
+def test_propagate_matches_skyfield():
+    skyfield_api = pytest.importorskip("skyfield.api")
+    from datetime import datetime, timezone
+
+    from sgp4.api import SatrecArray
+
+    from propagate import propagate, satrec_from_tle, tle_epoch
+
+    rec = satrec_from_tle(ISS_TLE)
+    ts = skyfield_api.load.timescale(builtin=True)
+    line1, line2 = ISS_TLE.splitlines()
+    sky = skyfield_api.EarthSatellite(line1, line2, ts=ts)
+    for dt in (0.0, 1800.0, 5400.0):
+        now = tle_epoch(rec) + dt
+        lat, lng, alt, ok = propagate(SatrecArray([rec]), now)
+        assert ok[0]
+        t = ts.from_datetime(datetime.fromtimestamp(now, timezone.utc))
+        ref = skyfield_api.wgs84.geographic_position_of(sky.at(t))
+        # UT1 ~ UTC and no polar motion: agree to well under a kilometre
+        got = np.array(to_ecef_np(lat, lng, alt)).ravel()
+        want = np.array(to_ecef_np(ref.latitude.degrees, ref.longitude.degrees, ref.elevation.km)).ravel()
+        assert np.linalg.norm(got - want) < 1.0
+        assert alt[0] == pytest.approx(ref.elevation.km, abs=0.1)
+
+
+def test_satrec_from_tle_rejects_empty_text():
+    from propagate import satrec_from_tle
+
+    with pytest.raises(ValueError):
+        satrec_from_tle("")
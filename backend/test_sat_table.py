@@ -0,0 +1,64 @@
+# test_sat_table.py
+# upsert_many must match the equivalent sequence of upsert() calls.
+import numpy as np
+
+from sat_table import GEO, LEO, SatTable
+
+
+def _assert_same(a: SatTable, b: SatTable):
+    assert a.n == b.n
+    assert a.id_to_row == b.id_to_row
+    assert a.satname == b.satname
+    np.testing.assert_array_equal(a.satid, b.satid)
+    np.testing.assert_array_equal(a.category, b.category)
+    np.testing.assert_array_equal(a.last_update, b.last_update)
+    for col in ("satlat", "satlng", "satalt"):
+        np.testing.assert_array_equal(getattr(a, col), getattr(b, col))
+    for col in ("ecef_x", "ecef_y", "ecef_z"):
+        np.testing.assert_allclose(getattr(a, col), getattr(b, col), rtol=0, atol=1e-6)
+
+
+def _upsert_each(t: SatTable, ids, names, lat, lng, alt, category, now):
+    for k in range(len(ids)):
+        t.upsert(int(ids[k]), names[k], float(lat[k]), float(lng[k]), float(alt[k]), category, now)
+
+
+def test_upsert_many_matches_repeated_upsert():
+    rng = np.random.default_rng(0)
+    a = SatTable(capacity=4)
+    b = SatTable(capacity=4)
+    for step, category in enumerate((LEO, GEO, LEO)):
+        # repeated ids inside a batch plus ids already in the table
+        ids = rng.integers(0, 40, size=30)
+        names = [f"sat{i}-{step}-{k}" for k, i in enumerate(ids.tolist())]
+        lat = rng.uniform(-90, 90, size=30)
+        lng = rng.uniform(-180, 180, size=30)
+        alt = rng.uniform(300, 36000, size=30)
+        now = 1000.0 + step
+        a.upsert_many(ids, names, lat, lng, alt, category, now)
+        _upsert_each(b, ids, names, lat, lng, alt, category, now)
+        _assert_same(a, b)
+
+
+def test_upsert_many_duplicates_first_row_last_values():
+    t = SatTable()
+    t.upsert_many(np.array([7, 3, 7]), ["a", "b", "c"], [1.0, 2.0, 3.0], [4.0, 5.0, 6.0],
+                  [400.0, 500.0, 600.0], LEO, 1.0)
+    assert t.ids() == [7, 3]
+    assert t.satname == ["c", "b"]
+    assert t.satlat.tolist() == [3.0, 2.0]
+
+
+def test_upsert_many_empty_is_noop():
+    t = SatTable()
+    t.upsert_many(np.array([], dtype=np.int64), [], [], [], [], LEO, 1.0)
+    assert len(t) == 0 and t.version == 0
+
+
+def test_grow_from_zero_capacity():
+    t = SatTable(capacity=0)
+    t.upsert(1, "a", 1.0, 2.0, 400.0, LEO, 1.0)
+    t.upsert_many(np.arange(2, 10), [str(i) for i in range(2, 10)], np.zeros(8), np.zeros(8),
+                  np.full(8, 400.0), GEO, 2.0)
+    assert len(t) == 9
+    assert t.category_counts() == [1, 8]
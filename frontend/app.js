@@ -223,8 +223,25 @@ function updateOrCreateSat(sat) {
 }
 
 // ---------- Snapshot handling ----------
+// Backend sends satellites column-wise ({satid: [...], satlat: [...], ...});
+// rebuild per-satellite objects for the entity code.
+function satsFromColumns(cols) {
+  if (!cols) return [];
+  if (Array.isArray(cols)) return cols;
+  const names = cols.category_names || ['LEO', 'GEO'];
+  return (cols.satid || []).map((satid, i) => ({
+    satid,
+    satname: cols.satname[i],
+    satlat: cols.satlat[i],
+    satlng: cols.satlng[i],
+    satalt: cols.satalt[i],
+    category: names[cols.category[i]],
+    last_update: cols.last_update[i],
+  }));
+}
+
 function handleSnapshot(data) {
-  const sats = data.sats || [];
+  const sats = satsFromColumns(data.sats);
 
   elTotal.innerText  = data.counts?.total ?? 0;
   elLEO.innerText    = data.counts?.leo ?? 0;